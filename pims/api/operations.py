@@ -20,7 +20,6 @@ from typing import Optional
 import aiofiles
 from cytomine import Cytomine
 from cytomine.models import (
-    AbstractImage,
     ImageInstance,
     Project,
     ProjectCollection,
@@ -144,7 +143,7 @@ def import_dataset(
     dataset_uploaded = []
     metadata_uploaded = []
     for dataset in datasets:
-        uploaded_files = run_import_from_path(
+        abstract_images = run_import_from_path(
             dataset,
             cytomine_auth,
             storage_id,
@@ -152,13 +151,6 @@ def import_dataset(
             user.id,
         )
 
-        abstract_images = []
-        for uf in uploaded_files:
-            data = Cytomine.get_instance().get(
-                f"uploadedfile/{uf.id}/abstractimage.json"
-            )
-            abstract_images.append(AbstractImage().populate(data))
-
         dataset_name = os.path.basename(dataset)
         success = import_metadata(dataset, abstract_images)
         if success:
@@ -39,13 +39,13 @@ from pims.api.utils.processing_parameter import (
     parse_bitdepth, parse_colormap_ids, parse_filter_ids,
     parse_gammas, parse_intensity_bounds, remove_useless_channels
 )
-from pims.cache import cache_image_response
+from pims.cache import PIMSCache, cache_image_response
 from pims.config import Settings, get_settings
 from pims.files.file import Path
 from pims.filters import FILTERS
 from pims.processing.colormaps import ALL_COLORMAPS
 from pims.processing.image_response import ResizedResponse
-from pims.utils.iterables import check_array_size_parameters, ensure_list
+from pims.utils.iterables import check_array_sizes, ensure_list
 
 router = APIRouter()
 api_tags = ['Resized']
@@ -130,7 +130,7 @@ def _show_resized(
     config: Settings,
     colormaps=None, c_reduction=ChannelReduction.ADD, z_reduction=None, t_reduction=None
 ):
-    in_image = path.get_spatial()
+    in_image = path.get_spatial(cache=True)
     check_representation_existence(in_image)
 
     out_format, mimetype = get_output_format(extension, headers.accept, PROCESSING_MIMETYPES)
@@ -157,10 +157,14 @@ def _show_resized(
     filters = ensure_list(filters)
     gammas = ensure_list(gammas)
 
-    array_parameters = ('min_intensities', 'max_intensities', 'colormaps', 'gammas')
-    check_array_size_parameters(
-        array_parameters, locals(), allowed=[0, 1, len(channels)], nullable=False
-    )
+    n_channels = len(channels)
+    check_array_sizes((
+        ('min_intensities', min_intensities, (0, 1, n_channels), False),
+        ('max_intensities', max_intensities, (0, 1, n_channels), False),
+        ('colormaps', colormaps, (0, 1, n_channels), False),
+        ('gammas', gammas, (0, 1, n_channels), False),
+        ('filters', filters, (0, 1), False),
+    ))
     intensities = parse_intensity_bounds(
         in_image, channels, z_slices, timepoints, min_intensities, max_intensities
     )
@@ -172,21 +176,16 @@ def _show_resized(
         channels, min_intensities, max_intensities, colormaps, gammas
     )
 
-    array_parameters = ('filters',)
-    check_array_size_parameters(
-        array_parameters, locals(), allowed=[0, 1], nullable=False
-    )
     filters = parse_filter_ids(filters, FILTERS)
 
     out_bitdepth = parse_bitdepth(in_image, bits)
 
-    return ResizedResponse(
+    image_response = ResizedResponse(
         in_image, channels, z_slices, timepoints,
         out_format, out_width, out_height,
         c_reduction, z_reduction, t_reduction,
         gammas, filters, colormaps, min_intensities, max_intensities,
         False, out_bitdepth, threshold, colorspace
-    ).http_response(
-        mimetype,
-        extra_headers=add_image_size_limit_header(dict(), *req_size, *out_size)
-    )
+    ).http_response(mimetype, stream=not PIMSCache.is_enabled())
+    add_image_size_limit_header(image_response.headers, *req_size, *out_size)
+    return image_response
@@ -12,7 +12,7 @@
 #  * See the License for the specific language governing permissions and
 #  * limitations under the License.
 from enum import Enum
-from typing import Optional
+from typing import MutableMapping, Optional
 
 from fastapi import Depends, Header
 
@@ -50,16 +50,16 @@ def serialize_header(value, style='simple', explode=False):  # noqa
 
 
 def add_image_size_limit_header(
-    headers: dict, request_width: int, request_height: int, safe_width: int,
-    safe_height: int
-) -> dict:
+    headers: MutableMapping[str, str], request_width: int, request_height: int,
+    safe_width: int, safe_height: int
+) -> MutableMapping[str, str]:
     """
-    Add X-Image-Size-Limit header to existing header dict if necessary.
+    Add X-Image-Size-Limit header to existing headers if necessary.
 
     Parameters
     ----------
     headers
-        Dict of headers to modify in place
+        Headers to modify in place (a dict or the headers of a response)
     request_width
         Width requested by the user
     request_height
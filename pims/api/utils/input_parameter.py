@@ -129,7 +129,7 @@ def parse_planes(
             raise BadRequestException(
                 detail=f'{plane} is not a valid index or range for {name}.'
             )
-    plane_set = sorted(set([idx for idx in plane_indexes if 0 <= idx < n_planes]))
+    plane_set = sorted({idx for idx in plane_indexes if 0 <= idx < n_planes})
     if len(plane_set) == 0:
         raise BadRequestException(detail=f"No valid indexes for {name}")
     return plane_set
@@ -141,8 +141,9 @@ def get_channel_indexes(image: Image, planes: List[Union[int, str]]) -> List[int
     This parameter is interpreted as a set such that duplicates are ignored.
     By default, all channels are considered.
     """
-    default = [*range(0, image.n_channels)]
-    return parse_planes(planes, image.n_channels, default, 'channels')
+    n_channels = image.n_channels
+    default = [*range(0, n_channels)]
+    return parse_planes(planes, n_channels, default, 'channels')
 
 
 def get_zslice_indexes(image: Image, planes: List[int]) -> List[int]:
@@ -15,4 +15,4 @@
 from .memory import IMAGE_CACHE
 # Package import sugars to hide cache module complexity to plugin developers.
 from .object import SimpleDataCache, cached_property, safe_cached_property
-from .redis import cache_data, cache_image_response, startup_cache
+from .redis import PIMSCache, cache_data, cache_image_response, startup_cache
@@ -16,7 +16,7 @@ import logging
 import os
 from functools import lru_cache
 
-from pydantic import BaseSettings, Extra
+from pydantic import BaseSettings, Extra, conint
 
 logger = logging.getLogger("pims.app")
 
@@ -24,8 +24,12 @@ logger = logging.getLogger("pims.app")
 class ReadableSettings(BaseSettings):
     root: str
     dataset_path: str = "/dataset"
+    dataset_import_max_workers: int = 4
     pending_path: str = "/tmp/uploaded"
     writing_path: str = "/data/pims/tmp"
+    # Where decrypted metadata is staged. Memory-backed by default, it falls
+    # back to the default temporary directory if unavailable or full.
+    metadata_staging_path: str = "/dev/shm"
     checker_resolution_file: str = "checkerResolution.csv"
     default_image_size_safety_mode: str = "SAFE_REJECT"
     default_annotation_origin: str = "LEFT_TOP"
@@ -43,6 +47,12 @@ class ReadableSettings(BaseSettings):
 
     task_queue_enabled: bool = True
     task_queue_url: str = "rabbitmq:5672"
+    # Children imports of a collection are sent by batches, each batch being
+    # processed sequentially by one worker. Batches are made small enough so
+    # that all import workers are used (larger batches reduce messaging
+    # overhead, smaller ones spread slow imports across workers).
+    task_queue_import_batch_size: conint(ge=1) = 32  # maximum batch size
+    task_queue_import_workers: conint(ge=1) = 4  # expected concurrency of import workers
 
     max_pixels_complete_histogram: int = 1024 * 1024
     max_length_complete_histogram: int = 1024
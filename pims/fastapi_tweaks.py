@@ -12,10 +12,9 @@
 #  * See the License for the specific language governing permissions and
 #  * limitations under the License.
 import asyncio
-import csv
 import email
 import json
-from copy import deepcopy
+from copy import copy, deepcopy
 from enum import Enum
 from typing import (
     Any, Callable, Coroutine, Dict, List, Mapping, Optional, Sequence, Tuple, Type,
@@ -63,46 +62,106 @@ query_style_to_delimiter = {
 # Force our settings in the context of PIMS until PR is merged.
 query_style = QueryStyle.form
 query_explode = False
+query_delimiter = query_style_to_delimiter[query_style]
 
 
-def request_params_to_args(
-    required_params: Sequence[ModelField],
-    received_params: Union[Mapping[str, Any], QueryParams, Headers],
-) -> Tuple[Dict[str, Any], List[ErrorWrapper]]:
-    values = {}
-    errors = []
+_IMMUTABLE_TYPES = (type(None), bool, int, float, complex, str, bytes, Enum)
+
+
+def _is_immutable(value: Any) -> bool:
+    if isinstance(value, (tuple, frozenset)):
+        return all(_is_immutable(v) for v in value)
+    return isinstance(value, _IMMUTABLE_TYPES)
+
+
+def _default_getter(default: Any) -> Callable[[], Any]:
+    """
+    Get a function returning a fresh field default value. Deep copy is only
+    used when required, as it is expensive.
+    """
+    if _is_immutable(default):
+        return lambda: default
+    if isinstance(default, (list, set, dict)) and all(
+        _is_immutable(v) for v in (
+            default.values() if isinstance(default, dict) else default
+        )
+    ):
+        return lambda: copy(default)
+    return lambda: deepcopy(default)
+
+
+def _build_params_specs(required_params: Sequence[ModelField]) -> List[tuple]:
+    specs = []
     for field in required_params:
         field_info = field.field_info
         assert isinstance(
             field_info, params.Param
         ), "Params must be subclasses of Param"
 
-        if utils.is_scalar_sequence_field(field) and isinstance(
-                received_params, (QueryParams, Headers)
-        ):
-            if isinstance(field_info, params.Query) and not query_explode:
-                value = received_params.get(field.alias)
+        specs.append((
+            field,
+            field.alias,
+            (field_info.in_.value, field.alias),
+            utils.is_scalar_sequence_field(field),
+            isinstance(field_info, params.Query) and not query_explode,
+            _default_getter(field.default)
+        ))
+    return specs
+
+
+class _SpecifiedParams(list):
+    """
+    List of dependant parameters carrying their precomputed field specs.
+    """
+    def __init__(self, required_params: Sequence[ModelField]):
+        super().__init__(required_params)
+        self.specs = _build_params_specs(self)
+
+
+def _specify_dependant_params(dependant: Dependant):
+    """
+    Precompute field introspection, which only depends on the endpoint
+    signature, once per dependant (and sub-dependants) of a route.
+    """
+    dependant.path_params = _SpecifiedParams(dependant.path_params)
+    dependant.query_params = _SpecifiedParams(dependant.query_params)
+    dependant.header_params = _SpecifiedParams(dependant.header_params)
+    dependant.cookie_params = _SpecifiedParams(dependant.cookie_params)
+    for sub_dependant in dependant.dependencies:
+        _specify_dependant_params(sub_dependant)
+
+
+def request_params_to_args(
+    required_params: Sequence[ModelField],
+    received_params: Union[Mapping[str, Any], QueryParams, Headers],
+) -> Tuple[Dict[str, Any], List[ErrorWrapper]]:
+    values = {}
+    errors = []
+    is_multi_dict = isinstance(received_params, (QueryParams, Headers))
+    # Dependants built per request (e.g. with dependency overrides) are not
+    # specified: their specs are computed on the fly.
+    specs = getattr(required_params, 'specs', None)
+    if specs is None:
+        specs = _build_params_specs(required_params)
+    for field, alias, loc, is_scalar_sequence, is_delimited, get_default in specs:
+        if is_scalar_sequence and is_multi_dict:
+            if is_delimited:
+                value = received_params.get(alias)
                 if value is not None:
-                    delimiter = query_style_to_delimiter.get(query_style)
-                    value = list(csv.reader([value], delimiter=delimiter))[0]
+                    # Serialized values are numbers or identifiers: no quoting.
+                    value = value.split(query_delimiter) if value else []
             else:
-                value = received_params.getlist(field.alias) or field.default
+                value = received_params.getlist(alias) or field.default
         else:
-            value = received_params.get(field.alias)
+            value = received_params.get(alias)
 
         if value is None:
             if field.required:
-                errors.append(
-                    ErrorWrapper(
-                        MissingError(), loc=(field_info.in_.value, field.alias)
-                    )
-                )
+                errors.append(ErrorWrapper(MissingError(), loc=loc))
             else:
-                values[field.name] = deepcopy(field.default)
+                values[field.name] = get_default()
             continue
-        v_, errors_ = field.validate(
-            value, values, loc=(field_info.in_.value, field.alias)
-        )
+        v_, errors_ = field.validate(value, values, loc=loc)
         if isinstance(errors_, ErrorWrapper):
             errors.append(errors_)
         elif isinstance(errors_, list):
@@ -134,6 +193,7 @@ def get_request_handler(
     dependency_overrides_provider: Optional[Any] = None,
 ) -> Callable[[Request], Coroutine[Any, Any, Response]]:
     assert dependant.call is not None, "dependant.call must be a function"
+    _specify_dependant_params(dependant)
     is_coroutine = asyncio.iscoroutinefunction(dependant.call)
     is_body_form = body_field and isinstance(body_field.field_info, params.Form)
     if isinstance(response_class, DefaultPlaceholder):
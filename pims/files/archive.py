@@ -153,12 +153,12 @@ class Archive(Path):
             # shutil.unpack_archive function (prior to python 3.9) performs archive unpacking in memory causing
             # high RAM memory usage for large ZIP archive extraction so need to use another library
             # see /pims-ce/-/issues/89
-            if self._format.name.lower == "zip":
+            if self._format.name.lower() == "zip":
                 with zipfile.ZipFile(self.absolute(), 'r') as zip_ref:
                     zip_ref.extractall(path)
             else:
                 shutil.unpack_archive(self.absolute(), path, self._format.name)
-        except shutil.ReadError as e:
+        except (shutil.ReadError, zipfile.BadZipFile) as e:
             raise ArchiveError(str(e))
 
         if clean:
@@ -36,6 +36,8 @@ EXTRACTED_DIR = "extracted"
 
 UPLOAD_DIR_PREFIX = "upload"
 EXTRACTED_FILE_DIR_PREFIX = "file"
+# Must not start with UPLOAD_DIR_PREFIX, see `Path.upload_root`
+DATASET_DIR_PREFIX = "dataset"
 
 ORIGINAL_STEM = "original"
 SPATIAL_STEM = "visualisation"
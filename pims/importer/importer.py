@@ -12,13 +12,16 @@
 #  * See the License for the specific language governing permissions and
 #  * limitations under the License.
 
+import errno
 import logging
+import math
 import os
 import shutil
 from base64 import b64decode
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from tempfile import TemporaryDirectory
-from typing import Any, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from uuid import UUID
 
 from bigpicture_metadata_interface import BPInterface
@@ -30,6 +33,7 @@ from cytomine.models import (
     AbstractImage,
     ProjectCollection,
     Property,
+    PropertyCollection,
     UploadedFile,
 )
 from isodate.duration import Duration
@@ -45,6 +49,7 @@ from pims.api.utils.models import HistogramType
 from pims.config import get_settings
 from pims.files.archive import Archive, ArchiveError
 from pims.files.file import (
+    DATASET_DIR_PREFIX,
     EXTRACTED_DIR,
     HISTOGRAM_STEM,
     ORIGINAL_STEM,
@@ -81,6 +86,9 @@ log = logging.getLogger("pims.app")
 FILE_ROOT_PATH = Path(get_settings().root)
 PENDING_PATH = Path(get_settings().pending_path)
 WRITING_PATH = Path(get_settings().writing_path)
+# Format factories hold no per-file state, they can be shared between imports
+IMPORTABLE_FORMAT_FACTORY = ImportableFormatFactory()
+SPATIAL_READABLE_FORMAT_FACTORY = SpatialReadableFormatFactory()
 
 
 class FileErrorProblem(BadRequestException):
@@ -107,7 +115,8 @@ class FileImporter:
     pending_file: Path
     pending_name: Optional[str]
 
-    # Paths to directories for the current import (in `FILE_ROOT_PATH`)
+    # Paths to directories for the current import (in `upload_parent`)
+    upload_parent: Path
     upload_dir: Optional[Path]
     processed_dir: Optional[Path]
     extracted_dir: Optional[Path]
@@ -129,7 +138,8 @@ class FileImporter:
 
     def __init__(
         self, pending_file: Path, pending_name: Optional[str] = None,
-        listeners: Optional[List[ImportListener]] = None
+        listeners: Optional[List[ImportListener]] = None,
+        upload_parent: Optional[Path] = None
     ):
         """
         Parameters
@@ -141,8 +151,15 @@ class FileImporter:
             If not provided, the current pending file name is used.
         listeners
             A list of import listeners
+        upload_parent
+            The directory where the upload directory is created.
+            If not provided, `FILE_ROOT_PATH` is used.
         """
+        self.upload_parent = (
+            upload_parent if upload_parent is not None else FILE_ROOT_PATH
+        )
         self.listeners = listeners if listeners is not None else []
+        self._dispatch = self._build_dispatch(self.listeners)
         self.pending_file = pending_file
         self.pending_name = pending_name
 
@@ -158,13 +175,29 @@ class FileImporter:
         self.processed_dir = None
         self.extracted_dir = None
 
+    @staticmethod
+    def _build_dispatch(
+        listeners: List[ImportListener]
+    ) -> Dict[ImportEventType, List[Callable]]:
+        """Resolve once the listener methods to call for each event type."""
+        dispatch = dict()
+        for method in ImportEventType:
+            handlers = list()
+            for listener in listeners:
+                handler = getattr(listener, method, None)
+                if handler is None:
+                    log.warning(f"No method {method} for import listener {listener}")
+                else:
+                    handlers.append(handler)
+            dispatch[method] = handlers
+        return dispatch
+
     def notify(self, method: ImportEventType, *args, **kwargs):
-        for listener in self.listeners:
+        for handler in self._dispatch.get(method, ()):
             try:
-                getattr(listener, method)(*args, **kwargs)
+                handler(*args, **kwargs)
             except AttributeError as e:
                 log.error(e)
-                log.warning(f"No method {method} for import listener {listener}")
 
     def run(self, prefer_copy: bool = False):
         """
@@ -197,7 +230,7 @@ class FileImporter:
                 f"{UPLOAD_DIR_PREFIX}"
                 f"{str(unique_name_generator())}"
             )
-            self.upload_dir = FILE_ROOT_PATH / upload_dir_name
+            self.upload_dir = self.upload_parent / upload_dir_name
             self.mkdir(self.upload_dir)
 
             if self.pending_name:
@@ -222,7 +255,7 @@ class FileImporter:
             # Identify format
             self.notify(ImportEventType.START_FORMAT_DETECTION, self.upload_path)
 
-            format_factory = ImportableFormatFactory()
+            format_factory = IMPORTABLE_FORMAT_FACTORY
             format = format_factory.match(self.upload_path)
             archive = None
             if format is None:
@@ -293,22 +326,8 @@ class FileImporter:
                 self.mksymlink(self.original_path, self.upload_path)
                 assert self.original_path.has_original_role()
 
-            # Check original image integrity
-            self.notify(ImportEventType.START_INTEGRITY_CHECK, self.original_path)
-            self.original = Image(self.original_path, format=format)
-            errors = self.original.check_integrity(check_metadata=True)
-            if len(errors) > 0:
-                self.notify(
-                    ImportEventType.ERROR_INTEGRITY_CHECK, self.original_path,
-                    integrity_errors=errors
-                )
-                raise ImageParsingProblem(self.original)
-            self.notify(ImportEventType.END_INTEGRITY_CHECK, self.original)
-
-            if format.is_spatial():
-                self.deploy_spatial(format)
-            else:
-                raise NotImplementedError()
+            # Check original image integrity and deploy spatial role
+            self.check_integrity_and_deploy_spatial(format)
 
             self.deploy_histogram(self.original.get_spatial())
 
@@ -325,10 +344,70 @@ class FileImporter:
             )
             raise e
 
-    def deploy_spatial(self, format: AbstractFormat) -> Image:
+    def check_integrity_and_deploy_spatial(self, format: AbstractFormat) -> Image:
+        """
+        Check the original image integrity and deploy its spatial representation.
+        When a conversion is needed, the integrity check runs concurrently with
+        the conversion, which uses its own format instance. The check is joined
+        as soon as the conversion ends, before its result is reported: integrity
+        errors take precedence over conversion errors, and the converted
+        image of an invalid original is flagged as erroneous.
+        """
+        self.notify(ImportEventType.START_INTEGRITY_CHECK, self.original_path)
+        self.original = Image(self.original_path, format=format)
+
+        if not (format.is_spatial() and format.need_conversion):
+            self.check_original_integrity(
+                self.original.check_integrity(check_metadata=True)
+            )
+            if not format.is_spatial():
+                raise NotImplementedError()
+            return self.deploy_spatial(format)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            integrity = executor.submit(
+                self.original.check_integrity, check_metadata=True
+            )
+
+            def wait_integrity():
+                errors = integrity.result()
+                if len(errors) > 0:
+                    # The conversion output comes from an invalid original
+                    self.notify(
+                        ImportEventType.ERROR_INTEGRITY_CHECK, self.spatial_path,
+                        integrity_errors=errors
+                    )
+                self.check_original_integrity(errors)
+
+            return self.deploy_spatial(
+                format.__class__(self.original_path), wait_integrity
+            )
+
+    def check_original_integrity(self, errors: List[Tuple[str, Exception]]):
+        """Notify the original image integrity check result."""
+        if len(errors) > 0:
+            self.notify(
+                ImportEventType.ERROR_INTEGRITY_CHECK, self.original_path,
+                integrity_errors=errors
+            )
+            raise ImageParsingProblem(self.original)
+        self.notify(ImportEventType.END_INTEGRITY_CHECK, self.original)
+
+    def deploy_spatial(
+        self, format: AbstractFormat,
+        wait_integrity: Optional[Callable[[], None]] = None
+    ) -> Image:
         """
         Deploy a spatial representation of the image so that it can be used for
         efficient spatial requests.
+
+        Parameters
+        ----------
+        format
+            The format of the original image.
+        wait_integrity
+            If set, called once the conversion (if any) is over, before its
+            result is reported. It raises if the original image is invalid.
         """
         self.notify(ImportEventType.START_SPATIAL_DEPLOY, self.original_path)
         if format.need_conversion:
@@ -342,13 +421,23 @@ class FileImporter:
                     self.spatial_path, self.upload_path
                 )
 
-                r = format.convert(self.spatial_path)
+                try:
+                    r = format.convert(self.spatial_path)
+                except Exception:
+                    if wait_integrity is not None:
+                        wait_integrity()
+                    raise
+                if wait_integrity is not None:
+                    wait_integrity()
+
                 if not r or not self.spatial_path.exists():
                     self.notify(
                         ImportEventType.ERROR_CONVERSION,
                         self.spatial_path
                     )
                     raise FormatConversionProblem()
+            except ImageParsingProblem:
+                raise
             except Exception as e:
                 self.notify(
                     ImportEventType.ERROR_CONVERSION,
@@ -360,7 +449,7 @@ class FileImporter:
 
             # Check format of converted file
             self.notify(ImportEventType.START_FORMAT_DETECTION, self.spatial_path)
-            spatial_format = SpatialReadableFormatFactory().match(self.spatial_path)
+            spatial_format = SPATIAL_READABLE_FORMAT_FACTORY.match(self.spatial_path)
             if not spatial_format:
                 self.notify(ImportEventType.ERROR_NO_FORMAT, self.spatial_path)
                 raise NoMatchingFormatProblem(self.spatial_path)
@@ -383,6 +472,9 @@ class FileImporter:
             self.notify(ImportEventType.END_INTEGRITY_CHECK, self.spatial)
 
         else:
+            if wait_integrity is not None:
+                wait_integrity()
+
             # Create spatial role
             spatial_filename = Path(f"{SPATIAL_STEM}.{format.get_identifier()}")
             self.spatial_path = self.processed_dir / spatial_filename
@@ -459,11 +551,19 @@ class FileImporter:
                 break
         if cytomine:
             task = Task.IMPORT_WITH_CYTOMINE
+            auth = cytomine.auth
+
+            def _task_args(child_: Path) -> list:
+                new_listener = cytomine.new_listener_from_registered_child(child_)
+                return [auth, str(child_), child_.name, new_listener, prefer_copy]
         else:
             task = Task.IMPORT
 
+            def _task_args(child_: Path) -> list:
+                return [str(child_), child_.name, prefer_copy]
+
         imported = list()
-        format_factory = ImportableFormatFactory()
+        format_factory = IMPORTABLE_FORMAT_FACTORY
         tasks = list()
         # Collection children are extracted recursively into collection
         # directories, until the directory is an image format (we can thus have
@@ -475,19 +575,11 @@ class FileImporter:
                 ImportEventType.REGISTER_FILE, child, self.upload_path
             )
             try:
-                if cytomine:
-                    new_listener = cytomine.new_listener_from_registered_child(child)
-                    args = [
-                        new_listener.auth, str(child), child.name,
-                        new_listener, prefer_copy
-                    ]
-                else:
-                    args = [str(child), child.name, prefer_copy]
-                tasks.append((task, args))
-            except Exception as _:  # noqa
+                tasks.append((task, _task_args(child)))
+            except Exception as e:  # noqa
                 # Do not propagate error to siblings
                 # Each importer is independent
-                pass
+                log.debug(f"Cannot schedule import of {child}: {e}")
 
         def _sequential_imports():
             for name, args_ in tasks:
@@ -497,9 +589,19 @@ class FileImporter:
             _sequential_imports()
         else:
             try:
+                # Imports are sent by batches to reduce messaging overhead,
+                # with at least as many batches as import workers.
+                settings = get_settings()
+                batch_size = max(1, min(
+                    settings.task_queue_import_batch_size,
+                    math.ceil(len(tasks) / settings.task_queue_import_workers)
+                ))
                 task_group = group([
-                    signature(CELERY_TASK_MAPPING.get(name), args_)
-                    for name, args_ in tasks
+                    signature(
+                        CELERY_TASK_MAPPING.get(Task.IMPORT_BATCH),
+                        [tasks[i:i + batch_size]]
+                    )
+                    for i in range(0, len(tasks), batch_size)
                 ])
                 # WARNING !
                 # These tasks are synchronous with respect to the parent task (the archive)
@@ -532,7 +634,7 @@ class FileImporter:
                 f"{UPLOAD_DIR_PREFIX}"
                 f"{str(unique_name_generator())}"
             )
-            self.upload_dir = FILE_ROOT_PATH / upload_dir_name
+            self.upload_dir = self.upload_parent / upload_dir_name
             self.mkdir(self.upload_dir)
 
             if self.pending_name:
@@ -552,7 +654,7 @@ class FileImporter:
 
             self.notify(ImportEventType.START_FORMAT_DETECTION, self.upload_path)
 
-            format_factory = ImportableFormatFactory()
+            format_factory = IMPORTABLE_FORMAT_FACTORY
             format = format_factory.match(self.upload_path)
 
             if format is None:
@@ -572,22 +674,7 @@ class FileImporter:
             self.mksymlink(self.original_path, self.upload_path)
             assert self.original_path.has_original_role()
 
-            self.notify(ImportEventType.START_INTEGRITY_CHECK, self.original_path)
-            self.original = Image(self.original_path, format=format)
-            errors = self.original.check_integrity(check_metadata=True)
-            if len(errors) > 0:
-                self.notify(
-                    ImportEventType.ERROR_INTEGRITY_CHECK,
-                    self.original_path,
-                    integrity_errors=errors,
-                )
-                raise ImageParsingProblem(self.original)
-            self.notify(ImportEventType.END_INTEGRITY_CHECK, self.original)
-
-            if not format.is_spatial():
-                raise NotImplementedError()
-
-            self.deploy_spatial(format)
+            self.check_integrity_and_deploy_spatial(format)
 
             self.deploy_histogram(self.original.get_spatial())
 
@@ -628,59 +715,116 @@ def run_import(
 def get_folder_size(folder_path) -> int:
     """Get the total size in bytes of a folder."""
     total_size = 0
-    for dirpath, _, filenames in os.walk(folder_path):
-        for file in filenames:
-            file_path = os.path.join(dirpath, file)
-            total_size += os.path.getsize(file_path)
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                # As os.walk, do not follow symbolic links to directories
+                if not entry.is_symlink():
+                    total_size += get_folder_size(entry.path)
+            else:
+                total_size += entry.stat().st_size
 
     return total_size
 
 
+def import_image_from_path(
+    image_path: Path,
+    cytomine_auth: Tuple[str, str, str],
+    storage_id: int,
+    image_server_id: int,
+    user_id: int,
+    upload_parent: Optional[Path] = None,
+) -> List[AbstractImage]:
+    """
+    Import an image directory of a dataset.
+    Return the abstract images created in Cytomine for the image.
+    """
+
+    # The folder size is only known to Cytomine once the import is over, so
+    # that the image directory is not walked before the import starts.
+    uf = UploadedFile(
+        original_filename=image_path.name,
+        filename=str(image_path),
+        size=0,
+        ext="",
+        content_type="",
+        id_storage=storage_id,
+        id_user=user_id,
+        id_image_server=image_server_id,
+        status=UploadedFile.UPLOADED,
+    )
+
+    cytomine_listener = CytomineListener(
+        cytomine_auth,
+        uf,
+        projects=ProjectCollection(),
+        user_properties=iter([]),
+    )
+    listeners = [StdoutListener(image_path.name), cytomine_listener]
+
+    fi = FileImporter(
+        image_path, image_path.name, listeners, upload_parent=upload_parent
+    )
+    try:
+        fi.import_from_path()
+    finally:
+        # Best effort: a failure here must not hide the import result.
+        try:
+            uf.size = get_folder_size(image_path)
+            uf.update()
+        except Exception as e:  # noqa
+            log.warning(f"Cannot update size of uploaded file {image_path}: {e}")
+
+    # The listener keeps the abstract images it saved in Cytomine.
+    return cytomine_listener.abstract_images
+
+
 def run_import_from_path(
     dataset_path: str,
     cytomine_auth: Tuple[str, str, str],
     storage_id: int,
     image_server_id: int,
     user_id: int,
-) -> List[UploadedFile]:
-    """Run importer from a given path."""
+) -> List[AbstractImage]:
+    """
+    Run importer from a given path.
+    Return the abstract images created in Cytomine for the imported images.
+    """
 
-    uploaded_files = []
     images_path = Path(os.path.join(dataset_path, "IMAGES"))
-    for item in images_path.iterdir():
-        if not item.is_dir():
-            continue
+    items = [item for item in images_path.iterdir() if item.is_dir()]
+    if not items:
+        return []
 
-        image_path = os.path.join(images_path, item)
-
-        uf = UploadedFile(
-            original_filename=item.name,
-            filename=image_path,
-            size=get_folder_size(image_path),
-            ext="",
-            content_type="",
-            id_storage=storage_id,
-            id_user=user_id,
-            id_image_server=image_server_id,
-            status=UploadedFile.UPLOADED,
-        )
-
-        listeners = [
-            StdoutListener(item.name),
-            CytomineListener(
-                cytomine_auth,
-                uf,
-                projects=ProjectCollection(),
-                user_properties=iter([]),
-            ),
+    # Upload directories of a dataset are grouped under a common parent.
+    dataset_dir = FILE_ROOT_PATH / Path(
+        f"{DATASET_DIR_PREFIX}{str(unique_name_generator())}"
+    )
+    dataset_dir.mkdir()
+
+    # Images are independent. Heavy work (I/O, conversion with libvips,
+    # histograms with numpy) releases the GIL, so threads are used. They share
+    # the current Cytomine client and its credentials.
+    max_workers = get_settings().dataset_import_max_workers
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                import_image_from_path,
+                item, cytomine_auth, storage_id, image_server_id, user_id,
+                upload_parent=dataset_dir,
+            )
+            for item in items
         ]
 
-        fi = FileImporter(Path(image_path), item.name, listeners)
-        fi.import_from_path()
-
-        uploaded_files.append(uf)
-
-    return uploaded_files
+    # A failed image is reported to Cytomine by its listener. It must not
+    # discard the images of the dataset that were successfully imported.
+    abstract_images = []
+    for item, future in zip(items, futures):
+        try:
+            abstract_images.extend(future.result())
+        except Exception as e:  # noqa
+            log.error(f"Import of dataset image {item} failed: {e}")
+    return abstract_images
 
 
 def is_encrypted(file_path: Path) -> bool:
@@ -693,6 +837,18 @@ def is_encrypted(file_path: Path) -> bool:
     return False
 
 
+def decrypt_file(
+    fs: Crypt4GHFileSystem,
+    source: str,
+    destination: str,
+    buffer_size: int = 1024 * 1024,
+) -> None:
+    """Decrypt a Crypt4GH file to a destination path, by chunks."""
+
+    with fs.open(source, "rb") as src, open(destination, "wb") as dst:
+        shutil.copyfileobj(src, dst, buffer_size)
+
+
 def parse_metadata(dataset_path: str) -> Optional[Tuple[Any, Any, Any]]:
     """Parse metadata from a given path."""
 
@@ -715,35 +871,69 @@ def parse_metadata(dataset_path: str) -> Optional[Tuple[Any, Any, Any]]:
         decode_key(settings.crypt4gh_private_key),
     )
 
-    with TemporaryDirectory() as tmp_dir:
-        metadata_directory_path = os.path.join(tmp_dir, "METADATA")
-        os.makedirs(metadata_directory_path, exist_ok=True)
+    # BPInterface only reads from a dataset path. Decrypted files are staged
+    # in memory rather than on disk, when possible.
+    staging_path = settings.metadata_staging_path
+    if staging_path and os.path.isdir(staging_path):
+        try:
+            return _parse_encrypted_metadata(
+                fs, dataset_path, files, staging_path
+            )
+        except OSError as e:
+            if e.errno != errno.ENOSPC:
+                raise
+            log.warning(
+                f"No space left in {staging_path} to stage decrypted metadata, "
+                f"fall back to default temporary directory"
+            )
 
-        for file in files:
-            with fs.open(os.path.join(metadata_path, file), "rb") as fp:
-                decrypted_data = fp.read()
+    return _parse_encrypted_metadata(fs, dataset_path, files)
 
-            with open(os.path.join(metadata_directory_path, file[:-5]), "wb") as fp:
-                fp.write(decrypted_data)
 
-        with fs.open(
-            os.path.join(dataset_path, "PRIVATE", "dac.xml.c4gh"),
-            "rb",
-        ) as fp:
-            decrypted_data = fp.read()
+def _parse_encrypted_metadata(
+    fs: Crypt4GHFileSystem,
+    dataset_path: str,
+    files: List[str],
+    staging_path: Optional[str] = None,
+) -> Optional[Tuple[Any, Any, Any]]:
+    """Decrypt metadata files in a staging directory and parse them."""
+
+    metadata_path = os.path.join(dataset_path, "METADATA")
+    with TemporaryDirectory(dir=staging_path) as tmp_dir:
+        metadata_directory_path = os.path.join(tmp_dir, "METADATA")
+        os.makedirs(metadata_directory_path, exist_ok=True)
 
         private_directory_path = os.path.join(tmp_dir, "PRIVATE")
         os.makedirs(private_directory_path, exist_ok=True)
-        with open(os.path.join(private_directory_path, "dac.xml"), "wb") as fp:
-            fp.write(decrypted_data)
+
+        decryptions = [
+            (
+                os.path.join(metadata_path, file),
+                os.path.join(metadata_directory_path, file[:-5]),
+            )
+            for file in files
+        ]
+        decryptions.append((
+            os.path.join(dataset_path, "PRIVATE", "dac.xml.c4gh"),
+            os.path.join(private_directory_path, "dac.xml"),
+        ))
+
+        # Decryption is done in C and releases the GIL, files are decrypted
+        # in parallel.
+        max_workers = min(len(decryptions), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(decrypt_file, fs, source, destination)
+                for source, destination in decryptions
+            ]
+            for future in futures:
+                future.result()
 
         if not BPInterface.validate(tmp_dir):
             return None
 
         return BPInterface.parse_xml_files(tmp_dir)
 
-    return None
-
 
 def import_metadata(dataset_path: str, abstract_images: List[AbstractImage]) -> bool:
     """Import metadata from a given path."""
@@ -756,17 +946,23 @@ def import_metadata(dataset_path: str, abstract_images: List[AbstractImage]) ->
     metadata_parser = BPMetadataParser(studies, beings, datasets)
 
     # Upload metadata file
+    success = True
     for ai in abstract_images:
         metadata = metadata_parser.parse({"image": ai.originalFilename})
+        if not metadata:
+            continue
+
+        properties = PropertyCollection(ai)
         for key, value in metadata.items():
             v = str(value) if isinstance(value, (datetime, Duration, UUID)) else value
-            Property(
-                ai,
-                f"MSMDAD.{key}",
-                v,
-            ).save()
+            properties.append(Property(ai, f"MSMDAD.{key}", v))
+
+        # All the properties of an image are uploaded in a single request
+        if not properties.save(chunk=None):
+            log.warning(f"Metadata of {ai.originalFilename} could not be saved")
+            success = False
 
-    return True
+    return success
 
 
 def decode_key(key: str) -> PrivateKey:
@@ -774,7 +970,12 @@ def decode_key(key: str) -> PrivateKey:
 
     NACL_KEY_LENGTH = SecretBox.KEY_SIZE
 
-    secret_key = b64decode(key)[-NACL_KEY_LENGTH:]
+    # Each 4-character base64 group decodes to 3 bytes: when the payload is made
+    # of whole groups, its last 48 characters hold the trailing key bytes.
+    payload = "".join(key.split())
+    if len(payload) % 4 == 0:
+        payload = payload[-48:]
+    secret_key = b64decode(payload)[-NACL_KEY_LENGTH:]
 
     if len(secret_key) != NACL_KEY_LENGTH:
         raise ValueError(f"The extracted key is not {NACL_KEY_LENGTH} bytes long!")
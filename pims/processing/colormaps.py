@@ -13,7 +13,10 @@
 #  * limitations under the License.
 
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from enum import Enum
+from functools import lru_cache
+from threading import Lock
 from typing import Dict, List, Optional, Union
 
 import numpy as np
@@ -27,6 +30,12 @@ from pims.utils.dtypes import np_dtype
 LookUpTable = np.ndarray  # Shape: (LUT size, LUT n_components)
 StackedLookUpTables = np.ndarray  # Shape: (N, LUT size, LUT n_components)
 
+# Look-up tables of all colormaps share a bounded cache, as colormaps for
+# arbitrary colors are created at runtime.
+LUT_CACHE_SIZE = 64
+_lut_cache: Dict[tuple, LookUpTable] = OrderedDict()
+_lut_cache_lock = Lock()
+
 
 class ColormapType(str, Enum):
     """
@@ -63,7 +72,6 @@ class Colormap(ABC):
         inverted = " (Inverted)" if self.inverted else ""
         return self.id.replace('_', ' ').title() + inverted
 
-    @abstractmethod
     def lut(
         self, size: int = 256, bitdepth: int = 8,
         n_components: Optional[int] = None,
@@ -90,8 +98,32 @@ class Colormap(ABC):
         Returns
         -------
         lut
-            the look-up table of shape (size, n_components)
+            the look-up table of shape (size, n_components). As look-up
+            tables are cached, it is read-only.
         """
+        key = (
+            self.identifier, size, bitdepth, n_components, force_black_as_first
+        )
+        with _lut_cache_lock:
+            lut = _lut_cache.get(key)
+            if lut is not None:
+                _lut_cache.move_to_end(key)
+                return lut
+
+        lut = self._build_lut(size, bitdepth, n_components, force_black_as_first)
+        lut.flags.writeable = False
+        with _lut_cache_lock:
+            _lut_cache[key] = lut
+            if len(_lut_cache) > LUT_CACHE_SIZE:
+                _lut_cache.popitem(last=False)
+        return lut
+
+    @abstractmethod
+    def _build_lut(
+        self, size: int, bitdepth: int, n_components: Optional[int],
+        force_black_as_first: bool
+    ) -> LookUpTable:
+        """Build a look-up table (LUT) for the colormap. See `lut`."""
         pass
 
     def n_components(self) -> int:
@@ -127,10 +159,9 @@ class MatplotlibColormap(Colormap):
         self._mpl_cmap[size] = get_cmap(mpl_name, mpl_size)
         self._mpl_cmap[size]._init()  # noqa
 
-    def lut(
-        self, size: int = 256, bitdepth: int = 8,
-        n_components: Optional[int] = None,
-        force_black_as_first: bool = False
+    def _build_lut(
+        self, size: int, bitdepth: int, n_components: Optional[int],
+        force_black_as_first: bool
     ) -> LookUpTable:
         if n_components is None or n_components > 3:
             n_components = self.n_components()
@@ -161,10 +192,9 @@ class ColorColormap(Colormap):
         r, g, b = self._color.as_float_tuple(alpha=False)
         return 1 if r == g == b else 3
 
-    def lut(
-        self, size: int = 256, bitdepth: int = 8,
-        n_components: Optional[int] = None,
-        force_black_as_first: bool = False
+    def _build_lut(
+        self, size: int, bitdepth: int, n_components: Optional[int],
+        force_black_as_first: bool
     ) -> LookUpTable:
         components = self._color.as_float_tuple(alpha=False)
         if n_components is None or n_components > 3:
@@ -189,14 +219,17 @@ class ColorColormap(Colormap):
         return lut.astype(np_dtype(bitdepth))
 
 
+@lru_cache(maxsize=LUT_CACHE_SIZE)
 def default_lut(
     size: int = 256, bitdepth: int = 8, n_components: int = 1,
     force_black_as_first: Optional[bool] = False  # Ignored but here for compat
 ) -> LookUpTable:
-    """Default LUT"""
-    return np.rint(np.stack(
+    """Default LUT (cached, read-only)"""
+    lut = np.rint(np.stack(
         (np.arange(size),) * n_components, axis=-1
     )).astype(np_dtype(bitdepth))
+    lut.flags.writeable = False
+    return lut
 
 
 def combine_lut(lut_a: LookUpTable, lut_b: LookUpTable) -> LookUpTable:
@@ -18,7 +18,6 @@ from typing import Tuple
 
 import numpy as np
 import zarr as zarr
-from skimage.exposure import histogram
 
 from pims.api.utils.models import Colorspace, HistogramType
 from pims.api.utils.output_parameter import get_thumb_output_dimensions
@@ -113,6 +112,14 @@ def change_colorspace_histogram(
     return hist
 
 
+def dtype_histogram(data: np.ndarray) -> np.ndarray:
+    """
+    Compute the histogram of an unsigned integer array, with one bin per
+    value of its dtype range.
+    """
+    return np.bincount(data.ravel(), minlength=np.iinfo(data.dtype).max + 1)
+
+
 def _extract_np_thumb(image):
     tw, th = get_thumb_output_dimensions(
         image, length=MAX_LENGTH_COMPLETE_HISTOGRAM, allow_upscaling=False
@@ -183,7 +190,7 @@ def build_histogram_file(
     npplane_hist = np.zeros(shape=shape + (n_values,), dtype=np.uint64)
     for data, c_range, z, t, ratio in extract_fn(in_image):
         for read, c in enumerate(c_range):
-            h, _ = histogram(data[:, :, read], source_range='dtype')
+            h = dtype_histogram(data[:, :, read])
             npplane_hist[t, z, c, :] += np.rint(h * ratio).astype(np.uint64)
     zplane.array(ZHF_HIST, npplane_hist)
     zplane.array(
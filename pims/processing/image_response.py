@@ -13,10 +13,11 @@
 #  * limitations under the License.
 from abc import ABC, abstractmethod
 from functools import lru_cache
-from typing import Dict, List, Optional, Tuple, Type, Union
+from itertools import chain
+from typing import Dict, Iterator, List, Optional, Tuple, Type, Union
 
 import numpy as np
-from starlette.responses import Response
+from starlette.responses import Response, StreamingResponse
 
 from pims.api.utils.mimetype import OutputExtension
 from pims.api.utils.models import (
@@ -35,7 +36,7 @@ from pims.processing.masks import (
     draw_condition_mask, rasterize_draw, rasterize_mask, rescale_draw,
     transparency_mask
 )
-from pims.processing.pixels import ImagePixels
+from pims.processing.pixels import DEFAULT_CHUNK_SIZE, ImagePixels
 from pims.processing.region import Region, Tile
 from pims.utils.dtypes import np_dtype
 from pims.utils.math import max_intensity
@@ -89,13 +90,40 @@ class ImageResponse(ABC):
             **self.out_format_params
         )
 
+    def iter_response_chunks(
+        self, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """
+        Get image response compressed using output extension compressor,
+        as an iterator of bytes chunks produced while encoding.
+        """
+        return self.process().compress_chunks(
+            self.out_format, self.best_effort_bitdepth, chunk_size,
+            **self.out_format_params
+        )
+
     def http_response(
-        self, mimetype: str, extra_headers: Optional[Dict[str, str]] = None
+        self, mimetype: str, extra_headers: Optional[Dict[str, str]] = None,
+        stream: bool = False
     ) -> Response:
         """
         Encapsulate image response into an HTTP response, ready to be sent to
-        the client.
+        the client. If `stream` is set, the encoded image is sent by chunks
+        as it is produced, without `Content-Length`. A streamed response
+        cannot be cached. Errors raised before the first chunk is produced
+        are raised here, later ones truncate the response body.
         """
+        if stream:
+            chunks = self.iter_response_chunks()
+            # Image processing is lazy: pull the first chunk so that reading
+            # or decoding errors are raised before the headers are sent.
+            first_chunk = next(chunks, b"")
+            return StreamingResponse(
+                chain((first_chunk,), chunks),
+                headers=extra_headers,
+                media_type=mimetype
+            )
+
         return Response(
             content=self.get_response_buffer(),
             headers=extra_headers,
@@ -210,36 +238,41 @@ class ProcessedView(MultidimImageResponse, ABC):
             return None
 
         n_channels = len(self.channels)
-        lut = np.zeros((n_channels, self.in_image.max_value + 1, 1))
+        # Single precision is enough for output bitdepths up to 16 bits.
+        lut = np.zeros(
+            (n_channels, self.in_image.max_value + 1, 1), dtype=np.float32
+        )
         if self.intensity_processing:
-            for c in range(n_channels):
-                mini = self.min_intensities[c]
-                maxi = self.max_intensities[c]
-                diff = maxi - mini
-                lut[c, mini:maxi] = np.linspace((0,), (1,), num=diff)
-                lut[c, maxi:] = 1
+            # Linear ramp from 0 at min to 1 at max - 1, for all channels at once.
+            minis = np.array(self.min_intensities)[:, np.newaxis]
+            maxis = np.array(self.max_intensities)[:, np.newaxis]
+            values = np.arange(self.in_image.max_value + 1)[np.newaxis, :]
+            ramps = (values - minis) / np.maximum(maxis - minis - 1, 1)
+            lut[:, :, 0] = np.where(values >= maxis, 1, np.clip(ramps, 0, 1))
         else:
             lut[:, :, 0] = np.linspace(
                 (0,) * n_channels, (1,) * n_channels,
                 num=self.in_image.max_value + 1
             ).T
 
+        # Operations are done in place to avoid temporary LUT copies.
         if self.gamma_processing:
             gammas = np.array(self.gammas)[:, np.newaxis, np.newaxis]
-            lut = np.power(lut, gammas)
+            np.power(lut, gammas, out=lut)
 
         if self.log_processing:
             # Apply logarithmic scale on image.
             # Formula: out = ln(1+ in) * max_per_channel / ln(1 + max_per_channel)
             # Reference: Icy Logarithmic 2D viewer plugin
             # (http://icy.bioimageanalysis.org/plugin/logarithmic-2d-viewer/)
-            lut = np.log1p(lut) * 1. / np.log1p(1)
+            np.log1p(lut, out=lut)
+            lut *= 1. / np.log1p(1)
 
         if self.threshold_processing:
             lut[lut < self.threshold] = 0.0
 
         lut *= self.max_intensity
-        lut = np.rint(lut)
+        np.rint(lut, out=lut)
         return lut.astype(np_dtype(self.best_effort_bitdepth))
 
     @property
@@ -484,6 +517,10 @@ class ResizedResponse(ProcessedView):
         )
 
     def raw_view(self, c: Union[int, List[int]], z: int, t: int) -> RawImagePixels:
+        # The whole image is requested: readers rely on shrink-on-load
+        # (see `VipsReader.vips_thumbnail`), which opens the smallest pyramid
+        # level larger than the output and only downsamples the remainder.
+        # Decoded tiles are kept in libvips operation cache.
         return self.in_image.thumbnail(
             self.out_width, self.out_height, c=c, z=z, t=t, precomputed=False
         )
@@ -14,13 +14,16 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import List, TYPE_CHECKING, Union
+from queue import Empty, Queue
+from threading import Event, Thread
+from typing import Iterator, List, TYPE_CHECKING, Union
 
 import numpy as np
 from PIL.Image import Image as PILImage
 from pyvips import (
     Image as VIPSImage,
-    Interpretation as VIPSInterpretation, Size as VIPSSize  # noqa
+    Interpretation as VIPSInterpretation, Size as VIPSSize,  # noqa
+    TargetCustom as VIPSTargetCustom
 )
 
 from pims.api.utils.mimetype import OutputExtension
@@ -37,6 +40,10 @@ DEFAULT_WEBP_LOSSLESS = False
 DEFAULT_PNG_COMPRESSION = 6
 DEFAULT_JPEG_QUALITY = 75
 
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Maximum number of encoded chunks waiting to be sent
+MAX_PENDING_CHUNKS = 4
+
 
 class ImagePixelsImpl(ABC):
     def __init__(self, pixels):
@@ -112,6 +119,13 @@ class ImagePixelsImpl(ABC):
     def compress(self, format: OutputExtension, bitdepth: int, **format_params) -> bytes:
         pass
 
+    @abstractmethod
+    def compress_chunks(
+        self, format: OutputExtension, bitdepth: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE, **format_params
+    ) -> Iterator[bytes]:
+        pass
+
 
 class NumpyImagePixels(ImagePixelsImpl):
     def __init__(self, pixels: np.ndarray):
@@ -145,7 +159,8 @@ class NumpyImagePixels(ImagePixelsImpl):
         dtype = self.pixels.dtype
         # TODO
         if reduction == ChannelReduction.MED:
-            self.pixels = np.rint(np.median(self.pixels, axis=2), dtype=dtype)
+            median = np.median(self.pixels, axis=2)
+            self.pixels = np.rint(median, out=median).astype(dtype, copy=False)
         elif reduction == ChannelReduction.MAX:
             self.pixels = np.max(self.pixels, axis=2)
         elif reduction == ChannelReduction.MIN:
@@ -189,6 +204,14 @@ class NumpyImagePixels(ImagePixelsImpl):
             format, bitdepth, **format_params
         )
 
+    def compress_chunks(
+        self, format: OutputExtension, bitdepth: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE, **format_params
+    ) -> Iterator[bytes]:
+        return self.context.transition_to(VIPSImage).compress_chunks(
+            format, bitdepth, chunk_size, **format_params
+        )
+
     def implementation(self):
         return np.ndarray
 
@@ -308,7 +331,8 @@ class VipsImagePixels(ImagePixelsImpl):
         self.pixels = condition_mask.ifthenelse(self.pixels, draw)
         return self
 
-    def compress(self, format: OutputExtension, bitdepth: int, **params) -> bytes:
+    @staticmethod
+    def _compression_params(format: OutputExtension, **params) -> dict:
         clean_params = {}
         if format == OutputExtension.JPEG:
             clean_params['Q'] = params.get(
@@ -331,6 +355,10 @@ class VipsImagePixels(ImagePixelsImpl):
                 'quality',
                 params.get('webp_quality', DEFAULT_WEBP_QUALITY)
             )
+        return clean_params
+
+    def compress(self, format: OutputExtension, bitdepth: int, **params) -> bytes:
+        clean_params = self._compression_params(format, **params)
 
         # Clip by casting image
         image = self.pixels.cast(vips_dtype(bitdepth))
@@ -338,6 +366,71 @@ class VipsImagePixels(ImagePixelsImpl):
         del image
         return buffer
 
+    def compress_chunks(
+        self, format: OutputExtension, bitdepth: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE, **params
+    ) -> Iterator[bytes]:
+        """
+        Compress the image and yield encoded bytes by chunks of
+        `chunk_size` as soon as the encoder produces them.
+
+        The encoder runs in a separate thread and writes into a bounded
+        queue so that at most `MAX_PENDING_CHUNKS` chunks are held in
+        memory at a time, whatever the image size.
+        """
+        clean_params = self._compression_params(format, **params)
+
+        # Clip by casting image
+        image = self.pixels.cast(vips_dtype(bitdepth))
+
+        chunks = Queue(maxsize=MAX_PENDING_CHUNKS)
+        cancelled = Event()
+        end = object()
+        pending = bytearray()
+
+        def on_write(data) -> int:
+            if cancelled.is_set():
+                # Abort encoding: consumer is gone.
+                return -1
+            pending.extend(data)
+            while len(pending) >= chunk_size:
+                chunks.put(bytes(pending[:chunk_size]))
+                del pending[:chunk_size]
+            return len(data)
+
+        def encode():
+            try:
+                target = VIPSTargetCustom()
+                target.on_write(on_write)
+                image.write_to_target(target, format, **clean_params)
+                if pending and not cancelled.is_set():
+                    chunks.put(bytes(pending))
+            except Exception as e:  # noqa
+                if not cancelled.is_set():
+                    chunks.put(e)
+            finally:
+                chunks.put(end)
+
+        encoder = Thread(target=encode, daemon=True)
+        encoder.start()
+        try:
+            while True:
+                chunk = chunks.get()
+                if chunk is end:
+                    break
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            cancelled.set()
+            # Unblock the encoder if it is waiting for free space.
+            while encoder.is_alive():
+                try:
+                    chunks.get(timeout=0.1)
+                except Empty:
+                    pass
+            encoder.join()
+
     def implementation(self):
         return VIPSImage
 
@@ -426,3 +519,9 @@ class ImagePixels:
     
     def compress(self, format: OutputExtension, bitdepth: int, **format_params) -> bytes:
         return self._impl.compress(format, bitdepth, **format_params)
+
+    def compress_chunks(
+        self, format: OutputExtension, bitdepth: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE, **format_params
+    ) -> Iterator[bytes]:
+        return self._impl.compress_chunks(format, bitdepth, chunk_size, **format_params)
@@ -48,6 +48,7 @@ celery_app.conf.update(
 celery_app.conf.task_routes = {
     "pims.tasks.worker.run_import": "pims-import-queue",
     "pims.tasks.worker.run_import_with_cytomine": "pims-import-queue",
+    "pims.tasks.worker.run_import_batch": "pims-import-queue",
 }
 
 
@@ -55,11 +56,13 @@ class Task(str, Enum):
     IMPORT = "IMPORT"
     IMPORT_WITH_CYTOMINE = "IMPORT_WITH_CYTOMINE"
     IMPORT_WITH_FILE = "IMPORT_WITH_FILE"
+    IMPORT_BATCH = "IMPORT_BATCH"
 
 
 CELERY_TASK_MAPPING = {
     Task.IMPORT: "pims.tasks.worker.run_import",
     Task.IMPORT_WITH_CYTOMINE: "pims.tasks.worker.run_import_with_cytomine",
+    Task.IMPORT_BATCH: "pims.tasks.worker.run_import_batch",
 }
 
 BG_TASK_MAPPING = {
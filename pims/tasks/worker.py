@@ -12,6 +12,8 @@
 #  * See the License for the specific language governing permissions and
 #  * limitations under the License.
 
+import logging
+
 from cytomine import Cytomine
 
 # Quick hack to avoid circular imports
@@ -23,7 +25,9 @@ except:  # noqa
 
 from pims.api.exceptions import AuthenticationException
 from pims.importer.importer import run_import as run_import_
-from pims.tasks.queue import celery_app
+from pims.tasks.queue import CELERY_TASK_MAPPING, celery_app, func_from_str
+
+log = logging.getLogger("pims.app")
 
 
 @celery_app.task
@@ -52,4 +56,20 @@ def run_import(filepath, name, prefer_copy):
 
 
 def run_import_fallback(filepath, name, prefer_copy):
-    run_import_(filepath, name, prefer_copy=prefer_copy)
\ No newline at end of file
+    run_import_(filepath, name, prefer_copy=prefer_copy)
+
+
+@celery_app.task
+def run_import_batch(tasks):
+    """
+    Run a batch of import tasks sequentially in the current worker.
+    `tasks` is a list of (task name, task args) tuples.
+    """
+    for name, args in tasks:
+        try:
+            # Calling a Celery task directly runs it in the current process.
+            func_from_str(CELERY_TASK_MAPPING.get(name))(*args)
+        except Exception as e:  # noqa
+            # Do not propagate error to siblings
+            # Each importer is independent
+            log.error(f"Task {name} failed in import batch: {e}")
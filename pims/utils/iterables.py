@@ -11,7 +11,9 @@
 #  * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  * See the License for the specific language governing permissions and
 #  * limitations under the License.
-from typing import Any, Dict, Iterable, List, Optional, Sized, TypeVar, Union
+from typing import (
+    Any, Collection, Dict, Iterable, List, Optional, Sized, Tuple, TypeVar, Union
+)
 
 from pims.api.exceptions import BadRequestException
 
@@ -124,6 +126,31 @@ def check_array_size_parameters(
         )
 
 
+def check_array_sizes(
+    specs: Iterable[Tuple[str, Optional[Sized], Collection[int], bool]]
+):
+    """
+    Verify several iterables in a single pass, raising on the first one
+    which does not have an allowed size.
+
+    Parameters
+    ----------
+    specs
+        Iterable of (name, iterable, allowed sizes, nullable) tuples. See
+        `check_array_size`.
+
+    Raises
+    ------
+    BadRequestException
+        If an iterable doesn't have one of its allowed sizes
+        or is None while it is not nullable.
+    """
+    for name, iterable, allowed, nullable in specs:
+        if iterable is not None and len(iterable) in allowed:
+            continue
+        check_array_size(iterable, allowed, nullable, name)
+
+
 def flatten(t):
     return [item for sublist in t for item in sublist]
 
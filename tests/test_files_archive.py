@@ -0,0 +1,48 @@
+#  * Copyright (c) 2020-2021. Authors: see NOTICE file.
+#  *
+#  * Licensed under the Apache License, Version 2.0 (the "License");
+#  * you may not use this file except in compliance with the License.
+#  * You may obtain a copy of the License at
+#  *
+#  *      http://www.apache.org/licenses/LICENSE-2.0
+#  *
+#  * Unless required by applicable law or agreed to in writing, software
+#  * distributed under the License is distributed on an "AS IS" BASIS,
+#  * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  * See the License for the specific language governing permissions and
+#  * limitations under the License.
+
+import pytest
+
+from pims.files.archive import Archive, ArchiveError, make_zip_archive
+from pims.files.file import Path
+
+
+def test_extract_zip(tmp_path):
+    content = Path(tmp_path, "content")
+    content.mkdir()
+    Path(content, "image.tif").write_bytes(b"data")
+    zip_path = Path(tmp_path, "archive.zip")
+    make_zip_archive(zip_path, content)
+
+    archive = Archive(zip_path)
+    assert archive.format.name == "zip"
+
+    extracted = Path(tmp_path, "extracted")
+    archive.extract(extracted)
+    assert Path(extracted, "image.tif").read_bytes() == b"data"
+
+
+def test_extract_corrupt_zip(tmp_path):
+    content = Path(tmp_path, "content")
+    content.mkdir()
+    Path(content, "image.tif").write_bytes(b"data" * 1024)
+    zip_path = Path(tmp_path, "archive.zip")
+    make_zip_archive(zip_path, content)
+
+    # Truncate the archive: its central directory is lost
+    zip_path.write_bytes(zip_path.read_bytes()[:-64])
+
+    archive = Archive(zip_path)
+    with pytest.raises(ArchiveError):
+        archive.extract(Path(tmp_path, "extracted"))
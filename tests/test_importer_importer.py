@@ -0,0 +1,49 @@
+#  * Copyright (c) 2020-2021. Authors: see NOTICE file.
+#  *
+#  * Licensed under the Apache License, Version 2.0 (the "License");
+#  * you may not use this file except in compliance with the License.
+#  * You may obtain a copy of the License at
+#  *
+#  *      http://www.apache.org/licenses/LICENSE-2.0
+#  *
+#  * Unless required by applicable law or agreed to in writing, software
+#  * distributed under the License is distributed on an "AS IS" BASIS,
+#  * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  * See the License for the specific language governing permissions and
+#  * limitations under the License.
+import binascii
+import os
+from base64 import b64decode, b64encode
+
+import pytest
+
+from pims.importer.importer import decode_key
+
+
+def _wrap(key: str, width: int = 20) -> str:
+    return "\n".join(key[i:i + width] for i in range(0, len(key), width)) + "\n"
+
+
+@pytest.mark.parametrize("n_bytes", [32, 33, 34, 35, 36, 48, 64, 99, 131, 199])
+def test_decode_key(n_bytes):
+    key = b64encode(os.urandom(n_bytes)).decode()
+    expected = b64decode(key)[-32:]
+
+    assert bytes(decode_key(key)) == expected
+    assert bytes(decode_key(_wrap(key))) == expected
+
+
+def test_decode_short_key():
+    key = b64encode(os.urandom(32)).decode()
+    assert len(key) < 48
+    assert bytes(decode_key(key)) == b64decode(key)[-32:]
+
+
+def test_decode_invalid_key():
+    key = b64encode(os.urandom(64)).decode()
+    # Length not multiple of 4: the full payload is decoded and rejected
+    with pytest.raises(binascii.Error):
+        decode_key(key[:-1])
+
+    with pytest.raises(ValueError):
+        decode_key(b64encode(os.urandom(16)).decode())
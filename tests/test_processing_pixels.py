@@ -0,0 +1,62 @@
+#  * Copyright (c) 2020-2021. Authors: see NOTICE file.
+#  *
+#  * Licensed under the Apache License, Version 2.0 (the "License");
+#  * you may not use this file except in compliance with the License.
+#  * You may obtain a copy of the License at
+#  *
+#  *      http://www.apache.org/licenses/LICENSE-2.0
+#  *
+#  * Unless required by applicable law or agreed to in writing, software
+#  * distributed under the License is distributed on an "AS IS" BASIS,
+#  * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  * See the License for the specific language governing permissions and
+#  * limitations under the License.
+import threading
+
+import numpy as np
+import pytest
+
+from pims.api.utils.mimetype import OutputExtension
+from pims.api.utils.models import ChannelReduction
+from pims.processing.pixels import ImagePixels
+
+
+def _pixels():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=(512, 512, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("format", [OutputExtension.PNG, OutputExtension.JPEG])
+def test_compress_chunks(format):
+    expected = ImagePixels(_pixels()).compress(format, 8)
+    chunks = list(ImagePixels(_pixels()).compress_chunks(format, 8, 1024))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) == 1024 for chunk in chunks[:-1])
+    assert b"".join(chunks) == expected
+
+
+def test_compress_chunks_early_close():
+    threads = set(threading.enumerate())
+    chunks = ImagePixels(_pixels()).compress_chunks(
+        OutputExtension.PNG, 8, 16
+    )
+    assert len(next(chunks)) == 16
+    assert len(set(threading.enumerate()) - threads) == 1
+
+    # Closing the generator stops the encoder thread
+    chunks.close()
+    assert set(threading.enumerate()) - threads == set()
+
+
+def test_numpy_channel_reduction_median():
+    rng = np.random.default_rng(0)
+    # Even number of channels: medians can be halfway between two values
+    pixels = rng.integers(0, 256, size=(16, 16, 4), dtype=np.uint8)
+    expected = np.rint(np.median(pixels, axis=2))
+
+    reduced = ImagePixels(pixels).channel_reduction(ChannelReduction.MED)
+    result = np.squeeze(reduced.np_array())
+
+    assert result.dtype == np.uint8
+    assert np.array_equal(result, expected)
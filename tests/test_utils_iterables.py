@@ -15,7 +15,7 @@
 import pytest
 
 from pims.api.exceptions import BadRequestException
-from pims.utils.iterables import check_array_size, ensure_list
+from pims.utils.iterables import check_array_size, check_array_sizes, ensure_list
 from tests.conftest import not_raises
 
 
@@ -34,6 +34,18 @@ def test_check_array_size():
         check_array_size([1], [], True)
 
 
+def test_check_array_sizes():
+    with not_raises(BadRequestException):
+        check_array_sizes(())
+        check_array_sizes((('a', [1], (0, 1), False), ('b', None, (1,), True)))
+
+    with pytest.raises(BadRequestException):
+        check_array_sizes((('a', [1], (0, 1), False), ('b', [1, 2], (0, 1), False)))
+
+    with pytest.raises(BadRequestException):
+        check_array_sizes((('a', None, (0, 1), False),))
+
+
 def test_ensure_list():
     assert ensure_list(3) == [3]
     assert ensure_list((2, 4)) == [(2, 4)]